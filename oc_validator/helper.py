@@ -74,15 +74,14 @@ class Helper:
         :return:
         """
 
-        # Count the number of instances of each error label
-        error_counts = {}
+        # Group the errors by label in a single pass over the report
+        errors_by_label = {}
         for error in error_report:
-            label = error['error_label']
-            error_counts[label] = error_counts.get(label, 0) + 1
+            errors_by_label.setdefault(error['error_label'], []).append(error)
 
         label_report = []
-        for label, count in error_counts.items():
-            errors_with_label = [e for e in error_report if e['error_label'] == label]
+        for label, errors_with_label in errors_by_label.items():
+            count = len(errors_with_label)
             explanation = errors_with_label[0]['message']  # all errors w/ a given label have the same message
             instance_details = []
             count_summary = f"There are {count} {label} issues in the document." if count > 1 else f"There is {count} {label} issue in the document. "
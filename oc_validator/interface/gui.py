@@ -1,13 +1,70 @@
 import csv
 import warnings
 from bs4 import BeautifulSoup, Tag
-from random import randint
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import cycle
 from jinja2 import Environment, FileSystemLoader
-from json import load
-from os.path import realpath
+from json import loads
+from os.path import realpath, dirname, abspath
 import webbrowser
 # from prettierfier import prettify_html
 
+try:
+    import orjson  # optional: much faster C parser for large reports
+except ImportError:
+    orjson = None
+
+_TEMPLATES_DIR = dirname(abspath(__file__))  # templates live next to this module
+
+# Prepare the Jinja2 environment once at import time: templates are parsed and
+# compiled a single time and then reused across calls.
+_ENV = Environment(loader=FileSystemLoader(_TEMPLATES_DIR))
+_VALID_TEMPLATE = _ENV.get_template('valid_template.html')
+_INVALID_TEMPLATE = _ENV.get_template('invalid-template.html')
+
+# fixed high-contrast palette for marking errors, cycled over however many errors
+# the report contains: past ~20 hues extra unique colors are indistinguishable anyway
+_ERROR_PALETTE = ('#e6194b', '#3cb44b', '#ffe119', '#4363d8', '#f58231',
+                  '#911eb4', '#42d4f4', '#f032e6', '#bfef45', '#fabed4',
+                  '#469990', '#dcbeff', '#9a6324', '#fffac8', '#800000',
+                  '#aaffc3', '#808000', '#ffd8b1', '#000075', '#a9a9a9')
+
+# minimum number of rows before converting them to HTML in parallel: below this,
+# the cost of spawning worker processes outweighs the gain
+_PARALLEL_ROW_THRESHOLD = 10000
+
+
+def _load_report(report_path):
+    """
+    Loads the JSON validation report, using orjson when installed and falling
+    back to the standard library parser otherwise.
+    :param report_path: the filepath to the JSON validation report.
+    :return (list): the parsed list of error dictionaries.
+    """
+    with open(report_path, 'rb', buffering=1 << 20) as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return loads(raw)
+
+
+def _make_html_row_args(args):
+    """Adapter for ProcessPoolExecutor.map, which passes a single argument per call."""
+    return make_html_row(*args)
+
+
+@lru_cache(maxsize=None)
+def _field_value_open(col_name):
+    """Opening tag of a field-value span; column names repeat on every row, so cache it."""
+    return f'<span class="field-value {col_name}">'
+
+
+@lru_cache(maxsize=None)
+def _empty_cell(col_name):
+    """Complete cell for an empty field value; fully determined by the column name."""
+    return f'<td><span class="field-value {col_name}"><span class="item"><span class="item-component"></span></span></span></td>'
+
 
 def make_html_row(row_idx, row):
     """
@@ -17,73 +74,61 @@ def make_html_row(row_idx, row):
     :return (str): the HTML table row
     """
 
-    html_string_list = []
+    cells = []  # one '<td>...</td>' string per column
 
     for col_name, value in row.items():
-        cell_html_string = ''
 
         if value:
             new_value = value
 
             if col_name == 'id':
                 items = value.split()
-                for idx, item in enumerate(items):
-                    s = f'<span class="item"><span class="item-component">{item}</span></span>'
-                    new_value = new_value.replace(item, s)
-                new_value = f'<span class="field-value {col_name}">{new_value}</span>'
+                new_value = ' '.join(f'<span class="item"><span class="item-component">{item}</span></span>'
+                                     for item in items)
+                new_value = _field_value_open(col_name) + new_value + '</span>'
 
             elif col_name in ['author', 'editor', 'publisher']:
                 items = value.split('; ')
+                html_items = []
 
-                for idx, item in enumerate(items):
+                for item in items:
                     if '[' in item and ']' in item:
                         ids_start = item.index('[')+1
                         ids_end = item.index(']')
                         ids = item[ids_start:ids_end].split()
                         name = item[:ids_start-1].strip()
-                        new_item = item
-
-                        for id in ids:
-                            new_item_component = f'<span class="item-component">{id}</span>'
-                            new_item = new_item.replace(id, new_item_component)
-                        new_item = new_item.replace(name, f'<span class="item-component">{name}</span>')
-                        s = f'<span class="item">{new_item}</span>'
-                        new_value = new_value.replace(item, s)
+                        wrapped_ids = ' '.join(f'<span class="item-component">{id}</span>' for id in ids)
+                        # malformed cells may carry text after the closing bracket: keep it,
+                        # since the GUI must show the row exactly as it appears in the CSV
+                        html_items.append(f'<span class="item"><span class="item-component">{name}</span> [{wrapped_ids}]{item[ids_end+1:]}</span>')
                     else:
-                        s = f'<span class="item"><span class="item-component">{item}</span></span>'
-                        new_value = new_value.replace(item, s)
+                        html_items.append(f'<span class="item"><span class="item-component">{item}</span></span>')
+
+                new_value = _field_value_open(col_name) + '; '.join(html_items) + '</span>'
+
 
-                new_value = f'<span class="field-value {col_name}">{new_value}</span>'
-                
-            
             elif col_name == 'venue':
                 if '[' in value and ']' in value:
                     ids_start = value.index('[')+1
                     ids_end = value.index(']')
                     ids = value[ids_start:ids_end].split()
                     name = value[:ids_start-1].strip()
-                    new_item = value
-
-                    for id in ids:
-                        new_item_component = f'<span class="item-component">{id}</span>'
-                        new_item = new_item.replace(id, new_item_component)
-                    new_item = new_item.replace(name, f'<span class="item-component">{name}</span>')
-                    new_value = f'<span class="field-value {col_name}"><span class="item">{new_item}</span></span>'
+                    wrapped_ids = ' '.join(f'<span class="item-component">{id}</span>' for id in ids)
+                    new_value = _field_value_open(col_name) + f'<span class="item"><span class="item-component">{name}</span> [{wrapped_ids}]{value[ids_end+1:]}</span></span>'
 
                 else:
-                    new_value = f'<span class="field-value {col_name}"><span class="item"><span class="item-component">{value}</span></span></span>'
+                    new_value = _field_value_open(col_name) + f'<span class="item"><span class="item-component">{value}</span></span></span>'
 
             else: # i.e. if col_name in ['type', 'issue', 'volume', 'page', 'pub_date']:
-                new_value = f'<span class="field-value {col_name}"><span class="item"><span class="item-component">{value}</span></span></span>'
-            
-            html_string_list.append(new_value)
+                new_value = _field_value_open(col_name) + f'<span class="item"><span class="item-component">{value}</span></span></span>'
+
+            cells.append(f'<td>{new_value}</td>')
         else:
-            new_value = f'<span class="field-value {col_name}"><span class="item"><span class="item-component"></span></span></span>'
-            html_string_list.append(new_value)
+            cells.append(_empty_cell(col_name))
 
     row_no_cell = f'<td><span>{row_idx}</span></td>'
     # add row index both as a column in the table and as ID of the HTML element corresponding to the row
-    res = f'<tr id="row{row_idx}">{row_no_cell}{"".join([f"<td>{cell_value}</td>" for cell_value in html_string_list])}</tr>'
+    res = f'<tr id="row{row_idx}">{row_no_cell}{"".join(cells)}</tr>'
     return res
 
 
@@ -96,95 +141,102 @@ def make_html_table(csv_path, rows_to_select: set, all_rows=False):
     :return (str): HTML string of the table (without validation information).
     """
 
-    with open(csv_path, 'r', encoding='utf-8') as f:
+    with open(csv_path, 'r', encoding='utf-8', newline='', buffering=1 << 20) as f:
         reader = csv.DictReader(f, dialect='unix')
         colnames = reader.fieldnames
 
         row_no_col = '<th>row no.</th>'
         thead = f'<thead><tr>{row_no_col}{"".join([f"<th>{cn}</th>" for cn in colnames])}</tr></thead>'
 
-        html_rows = []
-
         if not all_rows:
-            for row_idx, row in enumerate(reader):
-                if row_idx in rows_to_select:
-                    html_rows.append(make_html_row(row_idx, row))
+            selected_rows = [(row_idx, row) for row_idx, row in enumerate(reader)
+                             if row_idx in rows_to_select]
 
         else:  # all rows must be made html, ragardless of the content of rows_to_select
             if rows_to_select:
                 warnings.warn('The output HTML table will include all the rows. To include only invalid rows, set all_rows to False.', UserWarning)
-            for row_idx, row in enumerate(reader):
-                html_rows.append(make_html_row(row_idx, row))
+            selected_rows = list(enumerate(reader))
+
+    # rows are independent of each other, so large tables can be converted in parallel
+    if len(selected_rows) >= _PARALLEL_ROW_THRESHOLD:
+        with ProcessPoolExecutor() as executor:
+            html_rows = list(executor.map(_make_html_row_args, selected_rows, chunksize=1024))
+    else:
+        html_rows = [make_html_row(row_idx, row) for row_idx, row in selected_rows]
 
-        table:str = '<table id="table-data">' + thead + "\n".join(html_rows) + '</table>'
+    table:str = '<table id="table-data">' + thead + "\n".join(html_rows) + '</table>'
 
     return table
 
 
-def add_err_info(htmldoc:str, json_filepath):
+def add_err_info(htmldoc:str, report:list):
     """
     Adds validation information from the JSON validation report to the HTML table.
     :param htmldoc: the HTML table or the whole HTML document, as a string
-    :param json_filepath: the filepath to the JSON validation report.
+    :param report: the validation report, as the already-parsed list of error dictionaries.
     :return: the HTML string enriched with validation information
     """
 
-    with open(json_filepath, 'r', encoding='utf8') as jsonfile:
-        report = load(jsonfile)
-        data = BeautifulSoup(htmldoc, 'html.parser')
-
-        for erridx, err in enumerate(report):
-            color = "#{:06x}".format(randint(0, 0xFFFFFF))  # generates random hexadecimal color
-            table = err['position']['table']
-            for rowidx, fieldobj in table.items():
-                htmlrow = data.find(id=f'row{rowidx}')
-                for fieldkey, fieldvalue in fieldobj.items():
-                    htmlfield = htmlrow.find(class_=fieldkey)
-                    if fieldvalue is not None:
-                        all_children_items = htmlfield.find_all(class_='item')
-                        for itemidx in fieldvalue:
-                            item: Tag = all_children_items[itemidx]
-                            item['class'].append(f'err-idx-{erridx}')
-                            item['class'].append('invalid-data')
-                            item['class'].append('error') if err['error_type'] == 'error' else item['class'].append('warning')
-                            square = data.new_tag('span', **{'class':'error'}) if err['error_type'] == 'error' else data.new_tag('span', **{'class':'warning'})# TODO: add if condition for warnings, assigning the class according to the error_type in the report
-                            square['style'] = f'background-color: {color}'
-                            square['class'].append('error-icon')
-                            square['class'].append(f'err-idx-{erridx}')
-                            square['title'] = err['message']
-                            square['onclick'] = 'highlightInvolvedElements(this)'
-                            item.insert_after(square)  # inserts span element representing the error metadata
-
-                    else:
-                        errorpart = htmlfield
-                        errorpart['class'].append(f'err-idx-{erridx}')
-                        errorpart['class'].append('invalid-data')
-                        errorpart['class'].append('error') if err['error_type'] == 'error' else errorpart['class'].append('warning')
-                        square = data.new_tag('span', **{'class':'error'}) if err['error_type'] == 'error' else data.new_tag('span', **{'class':'warning'})
+    data = BeautifulSoup(htmldoc, 'lxml')  # lxml's C parser is much faster than html.parser on big tables
+
+    colors = cycle(_ERROR_PALETTE)
+
+    # index the table rows by their HTML id in a single pass, so each error
+    # reaches its row with a dict lookup instead of a whole-document search
+    rows_by_id = {tr['id']: tr for tr in data.find_all('tr', id=True)}
+
+    for erridx, err in enumerate(report):
+        color = next(colors)
+        table = err['position']['table']
+        for rowidx, fieldobj in table.items():
+            htmlrow = rows_by_id[f'row{rowidx}']
+            for fieldkey, fieldvalue in fieldobj.items():
+                htmlfield = htmlrow.find(class_=fieldkey)
+                if fieldvalue is not None:
+                    all_children_items = htmlfield.find_all(class_='item')
+                    for itemidx in fieldvalue:
+                        item: Tag = all_children_items[itemidx]
+                        item['class'].append(f'err-idx-{erridx}')
+                        item['class'].append('invalid-data')
+                        item['class'].append('error') if err['error_type'] == 'error' else item['class'].append('warning')
+                        square = data.new_tag('span', **{'class':'error'}) if err['error_type'] == 'error' else data.new_tag('span', **{'class':'warning'})# TODO: add if condition for warnings, assigning the class according to the error_type in the report
                         square['style'] = f'background-color: {color}'
                         square['class'].append('error-icon')
                         square['class'].append(f'err-idx-{erridx}')
                         square['title'] = err['message']
                         square['onclick'] = 'highlightInvolvedElements(this)'
-                        errorpart.insert_after(square)  # inserts span element representing the error metadata
+                        item.insert_after(square)  # inserts span element representing the error metadata
 
+                else:
+                    errorpart = htmlfield
+                    errorpart['class'].append(f'err-idx-{erridx}')
+                    errorpart['class'].append('invalid-data')
+                    errorpart['class'].append('error') if err['error_type'] == 'error' else errorpart['class'].append('warning')
+                    square = data.new_tag('span', **{'class':'error'}) if err['error_type'] == 'error' else data.new_tag('span', **{'class':'warning'})
+                    square['style'] = f'background-color: {color}'
+                    square['class'].append('error-icon')
+                    square['class'].append(f'err-idx-{erridx}')
+                    square['title'] = err['message']
+                    square['onclick'] = 'highlightInvolvedElements(this)'
+                    errorpart.insert_after(square)  # inserts span element representing the error metadata
+
+    # lxml wraps bare fragments in <html><body>: unwrap when the input was only the table
+    if '<html' in htmldoc[:200].lower():
         result = str(data)
-        return result
+    else:
+        result = data.body.decode_contents()
+    return result
 
 def create_and_show_gui(csv_path, report_path, output_html_path):
 
-    # Prepare the Jinja2 environment
-    env = Environment(loader=FileSystemLoader('.'))
-
-    with open(report_path, 'r', encoding='utf-8') as f:
-        report:list = load(f)
+    report:list = _load_report(report_path)
 
     if not len(report):  # -> the table validates, no errors!
         print('The submitted data is valid and there are no errors to represent.')
-        template = env.get_template('valid_template.html')
-        html_output = template.render()
-        with open(output_html_path, "w", encoding='utf-8') as file:
-            file.write(html_output)
+        with open(output_html_path, "w", encoding='utf-8', buffering=1 << 16) as file:
+            stream = _VALID_TEMPLATE.stream()
+            stream.enable_buffering(size=64)
+            stream.dump(file)  # writes the rendered chunks incrementally
         html_doc_fp = file.name
         print(f"HTML document generated successfully at {realpath(html_doc_fp)}.")
         webbrowser.open('file://' + realpath(html_doc_fp))
@@ -192,25 +244,21 @@ def create_and_show_gui(csv_path, report_path, output_html_path):
 
     error_count = len(report)
 
-    # set Jinja template to the one for invalid data representation
-    template = env.get_template('invalid-template.html')
-
     # get set containing the indexes of invalid rows
-    invalid_rows = set()
-    invalid_rows.update({int(idx) for d in report for idx in d['position']['table'].keys()})
+    invalid_rows = {int(idx) for d in report for idx in d['position']['table']}
 
     # create HTML table containing the invalid rows
     raw_html_table: str = make_html_table(csv_path, invalid_rows, all_rows=False)
 
-    # add error information to the HTML table
-    final_html_table = add_err_info(raw_html_table, report_path)
-
-    # Render the template with the table
-    html_output = template.render(table=final_html_table, error_count=error_count)
+    # add error information to the HTML table (reusing the already-parsed report)
+    final_html_table = add_err_info(raw_html_table, report)
 
-    # Save the resulting HTML document to a file
-    with open(output_html_path, "w", encoding='utf-8') as file:
-        file.write(html_output)
+    # Render the template with the table, streaming the chunks straight to the
+    # output file instead of materializing the whole document in memory first
+    with open(output_html_path, "w", encoding='utf-8', buffering=1 << 16) as file:
+        stream = _INVALID_TEMPLATE.stream(table=final_html_table, error_count=error_count)
+        stream.enable_buffering(size=64)
+        stream.dump(file)
         html_doc_fp = file.name
 
     print(f"HTML document generated successfully at {realpath(html_doc_fp)}.")
@@ -218,23 +266,3 @@ def create_and_show_gui(csv_path, report_path, output_html_path):
     # Open the HTML file in the default web browser
     webbrowser.open('file://' + realpath(html_doc_fp))
 
-
-def transpose_report(error_report:dict):
-    """
-    NOT USED!!!
-    Reads the errorreport dictionary and creates a new dictionary where keys
-    correspond to the indexes of the rows that are intereseted by an error,
-    and values are the full objects representing those errors.
-    """
-    out_data = dict()
-    for err_obj in error_report:
-        rows = err_obj['position']['table'].keys()
-        for row in rows:
-            if row not in out_data:
-                out_data[row] = [err_obj]
-            else:
-                out_data[row].append(err_obj)
-    res = {int(key): value for key, value in sorted(out_data.items(), key=lambda item: int(item[0]))}
-
-    return res
-
@@ -17,13 +17,35 @@ from yaml import full_load
 from json import load, dump
 from os.path import exists, join, dirname, abspath
 from os import makedirs, getcwd
-from re import finditer
+from re import compile
+from sys import intern
 from oc_validator.helper import Helper
 from oc_validator.csv_wellformedness import Wellformedness
 from oc_validator.id_syntax import IdSyntax
 from oc_validator.id_existence import IdExistence
 from oc_validator.semantics import Semantics
 from argparse import ArgumentParser
+from functools import lru_cache
+
+# ID-extraction patterns, compiled once and shared by all rows
+RA_ID_PATTERN = compile(r'((?:crossref|orcid|viaf|wikidata|ror):\S+)(?=\s|\])')
+VENUE_ID_PATTERN = compile(r'((?:doi|issn|isbn|url|wikidata|wikipedia|openalex):\S+)(?=\s|\])')
+
+
+@lru_cache(maxsize=None)
+def _load_messages():
+    """Reads and parses messages.yaml once per process; the result is read-only."""
+    script_dir = dirname(abspath(__file__))
+    with open(join(script_dir, 'messages.yaml'), 'r', encoding='utf-8') as f:
+        return full_load(f)
+
+
+@lru_cache(maxsize=None)
+def _load_id_type_alignment():
+    """Reads and parses id_type_alignment.json once per process; the result is read-only."""
+    script_dir = dirname(abspath(__file__))
+    with open(join(script_dir, 'id_type_alignment.json'), 'r', encoding='utf-8') as f:
+        return load(f)
 
 
 class Validator:
@@ -35,16 +57,15 @@ class Validator:
         self.syntax = IdSyntax()
         self.existence = IdExistence(use_meta_endpoint=use_meta_endpoint)
         self.semantics = Semantics()
-        script_dir = dirname(abspath(__file__))  # Directory where the script is located
-        self.messages = full_load(open(join(script_dir, 'messages.yaml'), 'r', encoding='utf-8'))
-        self.id_type_dict = load(open(join(script_dir, 'id_type_alignment.json'), 'r', encoding='utf-8'))
+        self.messages = _load_messages()
+        self.id_type_dict = _load_id_type_alignment()
         self.output_dir = output_dir
         if not exists(self.output_dir):
             makedirs(self.output_dir)
         self.visited_ids = dict()
 
     def read_csv(self, csv_doc):
-        with open(csv_doc, 'r', encoding='utf-8') as f:
+        with open(csv_doc, 'r', encoding='utf-8', newline='', buffering=1 << 20) as f:
             data_dict = list(DictReader(f))
             return data_dict
 
@@ -110,7 +131,9 @@ class Validator:
                 if field == 'id':
                     if value:
                         br_ids_set = set()  # set where to put well-formed br IDs only
-                        items = value.split(' ')
+                        # interning shares the storage of IDs repeated across rows and speeds
+                        # up the visited_ids lookups; single-ID fields skip the split entirely
+                        items = [intern(t) for t in value.split(' ')] if ' ' in value else [intern(value)]
 
                         for item_idx, item in enumerate(items):
 
@@ -238,8 +261,9 @@ class Validator:
                                                                   table=table))
 
                             else:
-                                ids = [m.group() for m in
-                                       finditer(r'((?:crossref|orcid|viaf|wikidata|ror):\S+)(?=\s|\])', item)]
+                                # IDs only occur between square brackets, so skip the regex
+                                # machinery entirely for items without any
+                                ids = RA_ID_PATTERN.findall(item) if '[' in item else []
 
                                 for id in ids:
                                     #  2nd validation level: EXTERNAL SYNTAX OF ID (RESPONSIBLE AGENT)
@@ -319,8 +343,7 @@ class Validator:
                                                               table=table))
 
                         else:
-                            ids = [m.group() for m in
-                                   finditer(r'((?:doi|issn|isbn|url|wikidata|wikipedia|openalex):\S+)(?=\s|\])', value)]
+                            ids = VENUE_ID_PATTERN.findall(value) if '[' in value else []
 
                             for id in ids:
 
@@ -456,8 +479,7 @@ class Validator:
                                                                   table=table))
 
                             else:
-                                ids = [m.group() for m in
-                                       finditer(r'((?:crossref|orcid|viaf|wikidata|ror):\S+)(?=\s|\])', value)]
+                                ids = RA_ID_PATTERN.findall(value) if '[' in value else []
 
                                 for id in ids:
 
@@ -561,7 +583,7 @@ class Validator:
                                                           table=table))
                     else:  # i.e. if string is not empty...
                         ids_set = set()  # set where to put valid IDs only
-                        items = value.split(' ')
+                        items = [intern(t) for t in value.split(' ')] if ' ' in value else [intern(value)]
 
                         for item_idx, item in enumerate(items):
 